@@ -1,31 +1,161 @@
+from functools import partial
+from io import BytesIO
+import os
+
 import click
 import ujson
 
 from clea import Article, clean_empty
+from clea.manifest import content_digest, Manifest
+from clea.stdio import FRAMING_GENS, prefetch_gen
+from clea.writer import COMPRESSION_OPENERS, JSONLWriter
 
 
-def xml2dict(xml_file):
-    art = Article(xml_file, raise_on_invalid=False)
+SIZE_UNITS = {"": 1, "K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30}
+
+json_dumps = partial(ujson.dumps,
+    ensure_ascii=False,
+    escape_forward_slashes=False,
+)
+
+
+def article2dict(art, filename):
     return clean_empty({**art.data_full,
-        "filename": xml_file.name,
+        "filename": filename,
         "aff_contrib_pairs": art.aff_contrib_full_indices,
     })
 
 
+def xml2dict(xml_file):
+    with Article(xml_file, raise_on_invalid=False) as art:
+        return article2dict(art, xml_file.name)
+
+
+def bytes2dict(raw_data):
+    try:
+        with Article(BytesIO(raw_data), raise_on_invalid=False) as art:
+            return article2dict(art, None)
+    except Exception as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+
+def run_stdio(writer, framing):
+    stdin = click.get_binary_stream("stdin")
+    with writer:
+        for raw_data in prefetch_gen(FRAMING_GENS[framing](stdin)):
+            writer.write(bytes2dict(raw_data))
+
+
+def incremental_changes_gen(xml_files, manifest):
+    """Generator of ``(path, stat, digest, data)`` tuples
+    for the new/changed files (regarding the given manifest),
+    followed by tombstones for the files in the manifest
+    that weren't given and no longer exist
+    (with ``None`` in the stat and digest).
+    The paths (and the output filenames) are absolute.
+    """
+    for xml_file in xml_files:
+        path = os.path.abspath(xml_file.name)
+        stat = os.fstat(xml_file.fileno())
+        if manifest.has_same_stat(path, stat):
+            continue
+        raw_data = xml_file.read()
+        digest = content_digest(raw_data)
+        if manifest.has_same_digest(path, stat, digest):
+            continue
+        with Article(BytesIO(raw_data), raise_on_invalid=False) as art:
+            yield path, stat, digest, article2dict(art, path)
+    for path in manifest.deleted_paths():
+        yield path, None, None, {"filename": path, "deleted": True}
+
+
+def run_incremental(writer, xml_files, manifest_path):
+    with Manifest(manifest_path) as manifest:
+        changes = []
+        with writer:
+            for path, stat, digest, data in incremental_changes_gen(
+                xml_files, manifest,
+            ):
+                writer.write(data)
+                changes.append((path, stat, digest))
+        for (path, stat, digest), (output, offset) in zip(changes,
+                                                          writer.offsets):
+            if stat is None:
+                manifest.remove(path)
+            else:
+                output = "-" if output is None else os.path.abspath(output)
+                manifest.store(path, stat, digest, output, offset)
+
+
+def create_writer(jsonl_output, rotate_size, **kwargs):
+    if jsonl_output == "-":
+        if rotate_size:
+            raise click.BadParameter("can't rotate the standard output",
+                                     param_hint="--rotate-size")
+        jsonl_output = click.get_binary_stream("stdout")
+    return JSONLWriter(jsonl_output, json_dumps,
+                       rotate_size=rotate_size, **kwargs)
+
+
+def parse_size(ctx, param, value):
+    """Click callback to parse sizes like 512, 64K, 100M or 2G."""
+    if value is None:
+        return 0
+    number, unit = value[:-1], value[-1:].upper()
+    if unit not in SIZE_UNITS:
+        number, unit = value, ""
+    try:
+        size = int(number) * SIZE_UNITS[unit]
+    except ValueError:
+        raise click.BadParameter(f"invalid size {value!r}")
+    if size <= 0:
+        raise click.BadParameter(f"size must be positive, got {value!r}")
+    return size
+
+
 @click.command()
-@click.option("jsonl_output", "-o", "--output",
-              type=click.File("w"), default="-",
+@click.option("jsonl_output", "-o", "--output", default="-",
+              type=click.Path(dir_okay=False, allow_dash=True),
               help="JSONL output file, "
                    "defaults to the standard output stream.")
-@click.argument("xml_files", type=click.File("r"), nargs=-1, required=True)
-def main(xml_files, jsonl_output):
-    for xml_file in xml_files:
-        ujson.dump(
-            xml2dict(xml_file), jsonl_output,
-            ensure_ascii=False,
-            escape_forward_slashes=False,
-        )
-        jsonl_output.write("\n")
+@click.option("--compress", type=click.Choice(sorted(COMPRESSION_OPENERS)),
+              help="Compress the output with the given algorithm.")
+@click.option("--rotate-size", callback=parse_size, metavar="SIZE",
+              help="Split the output in numbered shards "
+                   "(e.g. output-00000.jsonl) "
+                   "with at most this size (uncompressed) each, "
+                   "like 512, 64K, 100M or 2G.")
+@click.option("--incremental", metavar="MANIFEST",
+              type=click.Path(dir_okay=False),
+              help="Manifest database file of the processed files, "
+                   "writing only the new/changed files "
+                   "and tombstones for the deleted ones, "
+                   "with absolute paths as filenames.")
+@click.option("--stdio", type=click.Choice(sorted(FRAMING_GENS)),
+              help="Long-lived worker mode, reading XML documents "
+                   "from the standard input stream, "
+                   "either NUL-delimited or length-prefixed "
+                   "(4-byte unsigned big-endian integer), "
+                   "instead of reading the XML_FILES.")
+@click.argument("xml_files", type=click.File("rb"), nargs=-1)
+def main(xml_files, jsonl_output, compress, rotate_size, incremental, stdio):
+    if bool(stdio) == bool(xml_files):
+        raise click.UsageError("Either XML_FILES or --stdio is required")
+    if stdio and incremental:
+        raise click.UsageError("Can't use --incremental with --stdio")
+    writer = create_writer(jsonl_output,
+        compress=compress,
+        rotate_size=rotate_size,
+        track_offsets=bool(incremental),
+        flush_idle=bool(stdio),
+    )
+    if stdio:
+        return run_stdio(writer, stdio)
+    if incremental:
+        return run_incremental(writer, xml_files, incremental)
+    with writer:
+        for xml_file in xml_files:
+            writer.write(xml2dict(xml_file))
 
 
 if __name__ == "__main__":  # Not a "from clea import __main__"
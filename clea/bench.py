@@ -0,0 +1,251 @@
+from contextlib import contextmanager, ExitStack
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import click
+import numpy as np
+
+
+# Runs in a subprocess for each implementation,
+# using only the public API available in every clea version,
+# processing a path for each input line
+WORKER_SCRIPT = """
+import json, resource, sys, time
+import clea
+for line in iter(sys.stdin.readline, ""):
+    path = line.rstrip("\\n")
+    start = time.perf_counter()
+    try:
+        art = clea.Article(path, raise_on_invalid=False)
+        data = clea.clean_empty({**art.data_full,
+            "aff_contrib_pairs": art.aff_contrib_full_indices,
+        })
+    except Exception as exc:
+        data = {"error": repr(exc)}
+    seconds = time.perf_counter() - start
+    print(json.dumps({"path": path, "seconds": seconds, "data": data}),
+          flush=True)
+print(json.dumps({
+    "version": clea.__version__,
+    "module": clea.__file__,
+    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+PERCENTILES = [50, 90, 99]
+
+
+@contextmanager
+def implementation(spec, repo):
+    """Context manager that gives the ``(python, pythonpath)`` pair
+    to run the clea implementation in the given specification,
+    which is either a Python interpreter executable file
+    (of an environment where some clea version is installed),
+    a source tree directory
+    or a git reference in the given repository
+    (checked out in a temporary worktree).
+    """
+    if os.path.isfile(spec) and os.access(spec, os.X_OK):
+        yield spec, None
+    elif os.path.isdir(spec):
+        yield sys.executable, os.path.abspath(spec)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            worktree = os.path.join(tmp_dir, "worktree")
+            subprocess.run(["git", "-C", repo, "worktree", "add", "--detach",
+                            worktree, spec], check=True,
+                           stdout=subprocess.DEVNULL)
+            try:
+                yield sys.executable, worktree
+            finally:
+                subprocess.run(["git", "-C", repo, "worktree", "remove",
+                                "--force", worktree], check=True)
+
+
+@contextmanager
+def start_worker(python, pythonpath):
+    """Context manager that gives the running worker script process
+    (a ``subprocess.Popen`` with text pipes).
+    """
+    env = dict(os.environ)
+    if pythonpath:
+        env["PYTHONPATH"] = pythonpath
+    with tempfile.TemporaryDirectory() as cwd:  # Avoid importing from CWD
+        with subprocess.Popen([python, "-c", WORKER_SCRIPT],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              env=env, cwd=cwd,
+                              universal_newlines=True) as process:
+            yield process
+
+
+def read_row(process):
+    """Read the next worker output line as a dictionary."""
+    line = process.stdout.readline()
+    if not line:
+        raise click.ClickException("The worker finished unexpectedly")
+    return json.loads(line)
+
+
+def process_path(process, path):
+    """Process a single path in the worker,
+    returning its output row as a dictionary.
+    """
+    process.stdin.write(path + "\n")
+    process.stdin.flush()
+    return read_row(process)
+
+
+def finish_worker(process):
+    """Stop the worker, returning its summary as a dictionary."""
+    process.stdin.close()
+    return read_row(process)
+
+
+def diff_gen(base, head, keys=()):
+    """Generator of ``(keys, base_value, head_value)`` triples
+    for each difference in the given nested dictionaries/lists,
+    where ``keys`` is the tuple of keys/indices of the value.
+    """
+    if isinstance(base, dict) and isinstance(head, dict):
+        for key in sorted(set(base).union(head)):
+            yield from diff_gen(base.get(key), head.get(key), keys + (key,))
+    elif isinstance(base, list) and isinstance(head, list) \
+            and len(base) == len(head):
+        for idx, (base_item, head_item) in enumerate(zip(base, head)):
+            yield from diff_gen(base_item, head_item, keys + (idx,))
+    elif base != head:
+        yield keys, base, head
+
+
+def process_pair(workers, path, base_first):
+    """Process a single path in both workers (base and head),
+    in the given order, returning their output rows.
+    """
+    order = [0, 1] if base_first else [1, 0]
+    rows = [None, None]
+    for idx in order:
+        rows[idx] = process_path(workers[idx], path)
+    return rows
+
+
+def compare_outputs(workers, paths, repeat, warmup):
+    """Generator of ``(path, keys, base_value, head_value)``
+    for each difference in the worker outputs,
+    also getting the latencies of both (as a numpy array
+    indexed by implementation, round and path),
+    which are the generator return value.
+    The first ``warmup`` paths are processed once before the rounds
+    without being measured, and in every round both workers
+    process each path alternately, switching which one goes first.
+    Only the outputs of the first round are compared.
+    """
+    for path in paths[:warmup]:
+        process_pair(workers, path, base_first=True)
+    latencies = np.empty((2, repeat, len(paths)))
+    for round_idx in range(repeat):
+        for idx, path in enumerate(paths):
+            base_row, head_row = process_pair(workers, path,
+                                              (round_idx + idx) % 2 == 0)
+            latencies[:, round_idx, idx] = (base_row["seconds"],
+                                            head_row["seconds"])
+            if round_idx == 0:
+                for keys, base_value, head_value in diff_gen(
+                    base_row["data"], head_row["data"],
+                ):
+                    yield path, keys, base_value, head_value
+    return latencies
+
+
+def report_stats(name, summary, latencies):
+    """Print the statistics of a single implementation
+    from its latencies (a numpy array with a row for each round),
+    returning its median throughput (in documents per second).
+    """
+    throughput = np.median(latencies.shape[1] / latencies.sum(axis=1)) \
+                 if latencies.size else 0.
+    click.echo(f"{name}: clea {summary['version']} ({summary['module']})")
+    click.echo(f"  throughput: {throughput:.2f} documents/s "
+               f"(median of {len(latencies)} rounds)")
+    if latencies.size:
+        for pct, value in zip(PERCENTILES,
+                              np.percentile(latencies, PERCENTILES)):
+            click.echo(f"  latency p{pct}: {value * 1e3:.3f} ms")
+    click.echo(f"  peak memory: {summary['peak_rss_kb'] / 1024:.1f} MiB")
+    return throughput
+
+
+def report_diffs(diffs, max_diffs):
+    """Print the first differences from the ``compare_outputs`` generator,
+    returning the total number of differences and the latencies.
+    """
+    num_diffs = 0
+    while True:
+        try:
+            path, keys, base_value, head_value = next(diffs)
+        except StopIteration as stop:
+            return num_diffs, stop.value
+        num_diffs += 1
+        if num_diffs <= max_diffs:
+            field = ".".join(map(str, keys))
+            click.echo(f"{path}: {field}: {base_value!r} != {head_value!r}")
+
+
+@click.command()
+@click.option("--base", default="HEAD", show_default=True,
+              help="Reference implementation: a git reference, "
+                   "a source tree directory or the Python interpreter "
+                   "of an environment with clea installed.")
+@click.option("--head", default=".", show_default=True,
+              help="Implementation to be compared with the reference, "
+                   "in the same format of --base.")
+@click.option("--repo", default=".", show_default=True,
+              type=click.Path(exists=True, file_okay=False),
+              help="Git repository for the git references.")
+@click.option("--repeat", default=10, show_default=True,
+              type=click.IntRange(min=1),
+              help="Number of measurement rounds on the whole corpus.")
+@click.option("--warmup", default=1, show_default=True,
+              type=click.IntRange(min=0),
+              help="Number of documents processed before the rounds, "
+                   "not measured.")
+@click.option("--max-slowdown", default=0.1, show_default=True,
+              help="Maximum acceptable loss in the median throughput, "
+                   "as a fraction of the base median throughput.")
+@click.option("--max-diffs", default=20, show_default=True,
+              help="Maximum number of differences to be shown.")
+@click.argument("corpus", type=click.Path(exists=True, file_okay=False))
+def main(base, head, repo, repeat, warmup, max_slowdown, max_diffs, corpus):
+    """Differential benchmark/regression check of two clea implementations
+    on all the XML files in the CORPUS directory (recursively),
+    failing when the outputs differ or the head is too slow.
+    """
+    paths = sorted(os.path.abspath(os.path.join(dir_path, name))
+                   for dir_path, unused, names in os.walk(corpus)
+                   for name in names if name.lower().endswith(".xml"))
+    with ExitStack() as stack:
+        workers = [
+            stack.enter_context(start_worker(
+                *stack.enter_context(implementation(spec, repo))
+            ))
+            for spec in [base, head]
+        ]
+        num_diffs, latencies = report_diffs(
+            compare_outputs(workers, paths, repeat, warmup), max_diffs,
+        )
+        summaries = [finish_worker(worker) for worker in workers]
+
+    click.echo(f"{len(paths)} documents, {num_diffs} differences")
+    base_throughput = report_stats("base", summaries[0], latencies[0])
+    head_throughput = report_stats("head", summaries[1], latencies[1])
+    slow = head_throughput < base_throughput * (1 - max_slowdown)
+    if slow:
+        click.echo(f"Head median throughput is more than "
+                   f"{max_slowdown:.0%} lower than the base one")
+    sys.exit(1 if num_diffs or slow else 0)
+
+
+if __name__ == "__main__":
+    main()
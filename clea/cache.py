@@ -1,18 +1,14 @@
-from functools import lru_cache, partial
-
-
 class AbstractDescriptorCacheDecorator:
-
+    """Base for the cache decorators that store their results
+    in the ``_cache`` dictionary of each instance,
+    which should be created by the owner class initializer.
+    The results are keyed by the descriptor itself
+    (so aliases share the same entry),
+    and nothing referring to the instance gets stored in the instance,
+    avoiding reference cycles that only the cyclic GC would collect.
+    """
     def __init__(self, func):
         self.func = func
-        self.names = []
-
-    def __set_name__(self, owner, name):
-        self.names.append(name)
-
-    def store_result(self, instance, result):
-        for name in self.names:
-            setattr(instance, name, result)
 
 
 class CachedMethod(AbstractDescriptorCacheDecorator):
@@ -22,17 +18,33 @@ class CachedMethod(AbstractDescriptorCacheDecorator):
     caching an unbound method directly from the owner class.
     """
     def __get__(self, instance, owner):
-        result = lru_cache(None)(partial(self.func, instance))
-        self.store_result(instance, result)
-        return result
+        if instance is None:
+            return self
+        cache = instance._cache
+        func = self.func
+
+        def cached_method(*args, **kwargs):
+            key = self, args, tuple(sorted(kwargs.items()))
+            try:
+                return cache[key]
+            except KeyError:
+                result = cache[key] = func(instance, *args, **kwargs)
+                return result
+
+        return cached_method
 
 
 class CachedProperty(AbstractDescriptorCacheDecorator):
     """Descriptor and also a method decorator, like ``property``,
     where the decorated function gets called only once
-    and its result is stored in the instance dictionary afterwards.
+    and its result is stored in the instance cache afterwards.
     """
     def __get__(self, instance, owner):
-        result = self.func(instance)
-        self.store_result(instance, result)
-        return result
+        if instance is None:
+            return self
+        cache = instance._cache
+        try:
+            return cache[self]
+        except KeyError:
+            result = cache[self] = self.func(instance)
+            return result
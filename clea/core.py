@@ -1,5 +1,9 @@
 from contextlib import contextmanager
+from copy import deepcopy
 import html
+from html.entities import html5
+import weakref
+from xml.sax.saxutils import escape as xml_escape
 
 from lxml import etree
 from unidecode import unidecode
@@ -13,7 +17,34 @@ from .regexes import TAG_PATH_REGEXES, SUB_ARTICLE_NAME, get_branch_dicts
 
 
 _PARSER = etree.XMLParser(recover=True)
-_DOCTYPE = '<!DOCTYPE article PUBLIC "" "http://">\n'  # Force Entity objects
+_DOCTYPE = '<!DOCTYPE article PUBLIC "" "http://">\n'  # Empty gets None
+_DOCTYPE_BYTES = _DOCTYPE.encode("ascii")
+_ROOT_START_BYTES_REGEX = regex.compile(rb"<[^?!]")
+_XML_DECLARATION_BYTES_REGEX = regex.compile(
+    rb"(?:\xef\xbb\xbf)?\s*(<\?xml\s[^>]*\?>)"
+)
+
+# HTML5 named entities as escaped XML text, apart from the XML ones
+_XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+_HTML_ENTITIES = {
+    name[:-1]: xml_escape(value, {'"': "&quot;", "'": "&apos;"})
+    for name, value in html5.items()
+    if name.endswith(";") and name[:-1] not in _XML_ENTITIES
+}
+# Same, but as character references (for any ASCII-based encoding)
+_HTML_ENTITIES_BYTES = {
+    name[:-1].encode("ascii"):
+        "".join(f"&#{ord(char)};" for char in value).encode("ascii")
+    for name, value in html5.items()
+    if name.endswith(";") and name[:-1] not in _XML_ENTITIES
+}
+_ENTITY_REGEX_STRING = (
+    r"(<!\[CDATA\[.*?\]\]>|<!--.*?-->)"  # Kept as is
+    r"|&([A-Za-z][A-Za-z0-9]*);"
+)
+_ENTITY_REGEX = regex.compile(_ENTITY_REGEX_STRING, flags=regex.DOTALL)
+_ENTITY_BYTES_REGEX = regex.compile(_ENTITY_REGEX_STRING.encode("ascii"),
+                                    flags=regex.DOTALL)
 
 
 class InvalidInput(Exception):
@@ -88,6 +119,38 @@ def replace_html_entity_by_text(entity):
             parent.text += value
 
 
+def _replace_entity_match(match):
+    skipped, name = match.groups()
+    if skipped or name in _XML_ENTITIES:
+        return skipped or match.group()
+    return _HTML_ENTITIES.get(name, "&amp;" + name + ";")
+
+
+def _replace_entity_bytes_match(match):
+    skipped, name = match.groups()
+    if skipped or name.decode("ascii") in _XML_ENTITIES:
+        return skipped or match.group()
+    return _HTML_ENTITIES_BYTES.get(name, b"&amp;" + name + b";")
+
+
+def replace_html_entities(document):
+    """Replace the HTML5 named entities in the given XML document
+    by their escaped characters (in a string)
+    or by character references (in bytes, of any ASCII-based encoding),
+    before parsing it.
+    The XML predefined entities (e.g. ``&amp;``)
+    and the contents of comments and CDATA sections are kept as is,
+    and unknown entities become text (e.g. ``&amp;unknown;``).
+    """
+    if isinstance(document, bytes):
+        if b"&" not in document:
+            return document
+        return _ENTITY_BYTES_REGEX.sub(_replace_entity_bytes_match, document)
+    if "&" not in document:
+        return document
+    return _ENTITY_REGEX.sub(_replace_entity_match, document)
+
+
 class Article(object):
     """Article abstraction from its XML file."""
 
@@ -101,16 +164,78 @@ class Article(object):
                                     flags=regex.MULTILINE).group()
         except AttributeError:
             document = raw_data
-        self.root = etree.fromstring(_DOCTYPE + document, parser=_PARSER)
+        document = replace_html_entities(document)
+        root = etree.fromstring(_DOCTYPE + document, parser=_PARSER)
+        self._load_root(root, raise_on_invalid=raise_on_invalid)
+
+    @classmethod
+    def from_bytes(cls, buf, raise_on_invalid=True):
+        """Create an article from the raw bytes of an XML document,
+        skipping the file reading, decoding and text header removal.
+        The ``<?xml ... ?>`` declaration is kept,
+        so its encoding is used (defaults to UTF-8).
+        """
+        declaration = _XML_DECLARATION_BYTES_REGEX.match(buf)
+        match = _ROOT_START_BYTES_REGEX.search(buf)
+        document = replace_html_entities(buf[match.start():] if match
+                                          else buf)
+        root = etree.fromstring(
+            (declaration.group(1) if declaration else b"")
+            + _DOCTYPE_BYTES + document,
+            parser=_PARSER,
+        )
+        article = cls.__new__(cls)
+        article._load_root(root, raise_on_invalid=raise_on_invalid)
+        return article
+
+    @classmethod
+    def from_tree(cls, tree):
+        """Create an article from an already parsed lxml element
+        (or element tree) without serializing/parsing it again.
+        The given tree is copied before replacing its entities,
+        so it's never changed.
+        """
+        root = tree.getroot() if hasattr(tree, "getroot") else tree
+        if next(root.iterdescendants(tag=etree.Entity), None) is not None:
+            root = deepcopy(root)
+            # There should be no entity at all,
+            # but if there's any (legacy), they are the HTML5 ones
+            for entity in list(root.iterdescendants(tag=etree.Entity)):
+                replace_html_entity_by_text(entity)
+        article = cls.__new__(cls)
+        article._load_root(root)
+        return article
+
+    def _load_root(self, root, raise_on_invalid=True):
+        self._cache = {}
+        self.root = root
         if self.root is None:
             if raise_on_invalid:
                 raise InvalidInput("Not an XML file")
             self.root = etree.Element("article")
 
-        # There should be no entity at all,
-        # but if there's any (legacy), they are the HTML5 ones
-        for entity in self.root.iterdescendants(tag=etree.Entity):
-            replace_html_entity_by_text(entity)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the XML tree and all cached data,
+        closing the branches and sub-articles created by this instance.
+        Branches and sub-articles only hold a weak reference
+        to their article, so there's no reference cycle
+        and an unreferenced article is freed even without this,
+        but closing frees the tree while its branches are still alive.
+        Using a closed article raises ``ValueError``.
+        """
+        for value in self._cache.values():
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, (Article, Branch)):
+                        item.close()
+        self._cache.clear()
+        self.root = None
 
     @CachedProperty
     def tag_paths_pairs(self):
@@ -118,6 +243,8 @@ class Article(object):
 
     @CachedMethod
     def get(self, tag_name):
+        if self.root is None:
+            raise ValueError("Article is closed")
         tag_regex = TAG_PATH_REGEXES[tag_name]
         if tag_name == SUB_ARTICLE_NAME:
             return [SubArticle(parent=self, root=el, tag_name=tag_name)
@@ -144,21 +271,31 @@ class Article(object):
 
 class SubArticle(Article):
     def __init__(self, parent, root, tag_name):
-        self.parent = parent # Should be the <article> (main XML root)
+        self._cache = {}
+        self.parent = weakref.proxy(parent) # The <article> (main XML root)
         self.root = root # The <sub-article> element
         self.tag_name = tag_name
 
+    def close(self):
+        super().close()
+        self.parent = None
+
 
 class Branch(object):
+    __slots__ = ("_cache", "article", "node", "tag_name",
+                 "field_regexes", "field_attrs")
 
     def __init__(self, article, node, tag_name):
-        self.article = article
+        self._cache = {}
+        self.article = weakref.proxy(article)
         self.node = node # Branch "root" element
         self.tag_name = tag_name
         self.field_regexes, self.field_attrs = get_branch_dicts(tag_name)
 
     @CachedProperty
     def paths_pairs(self):
+        if self.node is None:
+            raise ValueError("Branch is closed")
         return list(etree_path_gen(self.node))
 
     @CachedProperty
@@ -194,8 +331,17 @@ class Branch(object):
 
     @CachedMethod
     def get(self, field):
+        if self.node is None:
+            raise ValueError("Branch is closed")
         attr = self.field_attrs[field]
         nodes = self.get_field_nodes(field)
         return [node_getattr(node, attr) for node in nodes]
 
+    def close(self):
+        """Release the cached data and the references
+        to the article and to the branch root element.
+        """
+        self._cache.clear()
+        self.article = self.node = None
+
     __getitem__ = __getattr__ = lambda self, name: self.get(name)
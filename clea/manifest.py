@@ -0,0 +1,87 @@
+import hashlib
+import os
+import sqlite3
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    output TEXT,
+    offset INTEGER
+)
+"""
+
+
+def content_digest(raw_data):
+    """Hexadecimal SHA-256 hash of the given bytes."""
+    return hashlib.sha256(raw_data).hexdigest()
+
+
+class Manifest:
+    """File manifest for incremental processing,
+    stored in a SQLite database with the size, modification time
+    and content hash of each processed file (keyed by its absolute path),
+    as well as where its JSON line was written
+    in the run that last extracted it:
+    the output file/shard name (``"-"`` for the standard output)
+    and the (uncompressed) byte offset of the line in it.
+    Changes are only stored when the manifest is committed.
+    """
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(SCHEMA)
+        self.entries = {
+            path: (size, mtime_ns, digest) for path, size, mtime_ns, digest
+            in self.conn.execute("SELECT path, size, mtime_ns, digest "
+                                 "FROM files")
+        }
+        self.seen = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.conn.commit()
+        self.conn.close()
+
+    def has_same_stat(self, path, stat):
+        """Check the file entry for the same size and modification time,
+        marking the path as seen in this run.
+        """
+        self.seen.add(path)
+        entry = self.entries.get(path)
+        return entry is not None and \
+            entry[:2] == (stat.st_size, stat.st_mtime_ns)
+
+    def has_same_digest(self, path, stat, digest):
+        """Check the file entry for the same content hash,
+        updating its stat data when it's the same.
+        """
+        entry = self.entries.get(path)
+        if entry is None or entry[2] != digest:
+            return False
+        self.conn.execute(
+            "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+            (stat.st_size, stat.st_mtime_ns, path),
+        )
+        return True
+
+    def deleted_paths(self):
+        """Sorted list of known paths that weren't seen in this run
+        and whose files no longer exist.
+        """
+        return sorted(path for path in set(self.entries).difference(self.seen)
+                           if not os.path.exists(path))
+
+    def store(self, path, stat, digest, output, offset):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, digest, output, offset),
+        )
+
+    def remove(self, path):
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
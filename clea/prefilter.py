@@ -0,0 +1,218 @@
+from collections import Counter
+import math
+
+import regex
+
+
+_QUANTIFIER_REGEX = regex.compile(r"\{(?:e<=(\d+)|(\d+)(,(\d*))?)\}")
+_CONSTRAINT_REGEX = regex.compile(r"\{[^}]*<")
+_ZERO_WIDTH_ESCAPES = set("bBAZ")
+
+
+class Summary:
+    """Length bounds, required characters and anchoring
+    of a regex or of a part of it.
+    """
+    def __init__(self, min_len=0, max_len=0, required=None,
+                 start=False, end=False):
+        self.min_len = min_len
+        self.max_len = max_len
+        self.required = Counter() if required is None else required
+        self.start = start  # Anchored in the beginning (^)
+        self.end = end  # Anchored in the end ($)
+
+    def __add__(self, other):
+        return Summary(
+            min_len=self.min_len + other.min_len,
+            max_len=self.max_len + other.max_len,
+            required=self.required + other.required,
+            start=self.start or (self.max_len == 0 and other.start),
+            end=other.end or (other.max_len == 0 and self.end),
+        )
+
+    def __or__(self, other):
+        return Summary(
+            min_len=min(self.min_len, other.min_len),
+            max_len=max(self.max_len, other.max_len),
+            required=self.required & other.required,
+            start=self.start and other.start,
+            end=self.end and other.end,
+        )
+
+    def repeat(self, low, high):
+        return Summary(
+            min_len=self.min_len * low,
+            max_len=self.max_len * high if self.max_len else 0,
+            required=Counter({k: v * low for k, v in self.required.items()
+                                         if low}),
+        )
+
+    def fuzzy(self, errors):
+        return Summary(
+            min_len=max(0, self.min_len - errors),
+            max_len=self.max_len + errors,
+            required=Counter({k: v - errors
+                              for k, v in self.required.items()
+                              if v > errors}),
+        )
+
+
+class _PatternParser:
+    """Recursive descent parser of a regex pattern string
+    that builds its ``Summary``.
+    """
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    def parse(self):
+        result = self.alternation()
+        if self.pos != len(self.pattern):
+            raise ValueError(f"Unbalanced parenthesis in {self.pattern!r}")
+        return result
+
+    def alternation(self):
+        result = self.sequence()
+        while self.pattern.startswith("|", self.pos):
+            self.pos += 1
+            result |= self.sequence()
+        return result
+
+    def sequence(self):
+        result = Summary()
+        while self.pos < len(self.pattern) \
+                and self.pattern[self.pos] not in "|)":
+            result += self.quantified(self.atom())
+        return result
+
+    def atom(self):
+        char = self.pattern[self.pos]
+        self.pos += 1
+        if char == "(":
+            return self.group()
+        if char == "[":
+            self.pos = self.pattern.index("]", self.pos + 1) + 1
+            return Summary(1, 1)
+        if char == "\\":
+            return self.escape()
+        if char == ".":
+            return Summary(1, 1)
+        if char in "^$":
+            return Summary(start=char == "^", end=char == "$")
+        return Summary(1, 1, Counter(char))
+
+    def group(self):
+        if self.pattern.startswith("?:", self.pos):
+            self.pos += 2
+        elif self.pattern.startswith("?", self.pos):
+            raise ValueError(f"Unsupported group in {self.pattern!r}")
+        result = self.alternation()
+        self.pos += 1  # Closing parenthesis
+        result.start = result.end = False
+        return result
+
+    def escape(self):
+        char = self.pattern[self.pos]
+        self.pos += 1
+        if char in _ZERO_WIDTH_ESCAPES:
+            raise ValueError(f"Unsupported escape in {self.pattern!r}")
+        if char.isalnum():  # Character class or special character
+            return Summary(1, 1)
+        return Summary(1, 1, Counter(char))
+
+    def quantified(self, summary):
+        char = self.pattern[self.pos:self.pos + 1]
+        if char in ("?", "*", "+"):
+            self.pos += 1
+            low, high = {"?": (0, 1), "*": (0, math.inf), "+": (1, math.inf)
+                        }[char]
+            return summary.repeat(low, high)
+        match = _QUANTIFIER_REGEX.match(self.pattern, self.pos)
+        if not match:
+            if _CONSTRAINT_REGEX.match(self.pattern, self.pos):
+                raise ValueError(f"Unsupported constraint in {self.pattern!r}")
+            return summary
+        self.pos = match.end()
+        errors, low, comma, high = match.groups()
+        if errors:
+            return summary.fuzzy(int(errors))
+        if not comma:
+            return summary.repeat(int(low), int(low))
+        return summary.repeat(int(low), int(high) if high else math.inf)
+
+
+def summarize(pattern):
+    """Summary (length bounds, required characters and anchoring)
+    of the given regex pattern string.
+    """
+    return _PatternParser(pattern).parse()
+
+
+class PrefilteredRegex:
+    """Compiled regex wrapper that checks whether the string
+    satisfies the necessary conditions for a match
+    before evaluating the actual (fuzzy) regex,
+    counting how many strings are checked and rejected.
+    These conditions are derived from the pattern string,
+    regarding the string length and the minimum number of occurrences
+    of some characters, and they hold even with the maximum number
+    of errors allowed by each fuzzy ``{e<=N}`` constraint.
+    Only the regex syntax used in ``clea.regexes`` is supported.
+    """
+    instances = []
+
+    def __init__(self, compiled):
+        self.regex = compiled
+        summary = summarize(compiled.pattern)
+        self.min_len = summary.min_len
+        self.max_len = math.inf
+        if summary.start and summary.end \
+                and not compiled.flags & regex.MULTILINE:
+            self.max_len = summary.max_len + 1  # "$" matches before "\n"
+        self.required = sorted(summary.required.items())
+        self.checked = self.rejected = 0
+        self.instances.append(self)
+
+    def __getattr__(self, name):
+        if name == "regex":
+            raise AttributeError(name)
+        return getattr(self.regex, name)
+
+    def accepts(self, string):
+        """Check the necessary conditions for a match in the string."""
+        self.checked += 1
+        if not self.min_len <= len(string) <= self.max_len or \
+                any(string.count(char) < count
+                    for char, count in self.required):
+            self.rejected += 1
+            return False
+        return True
+
+    def search(self, string):
+        if self.accepts(string):
+            return self.regex.search(string)
+        return None
+
+    def finditer(self, string):
+        if self.accepts(string):
+            return self.regex.finditer(string)
+        return iter(())
+
+
+def prefilter_stats():
+    """Dictionary with the number of strings checked and rejected
+    by the prefilters of all ``PrefilteredRegex`` instances,
+    and the resulting rejection rate.
+    """
+    checked = sum(pr.checked for pr in PrefilteredRegex.instances)
+    rejected = sum(pr.rejected for pr in PrefilteredRegex.instances)
+    return {
+        "checked": checked,
+        "rejected": rejected,
+        "rejection_rate": rejected / checked if checked else 0.,
+    }
+
+
+def reset_prefilter_stats():
+    for pr in PrefilteredRegex.instances:
+        pr.checked = pr.rejected = 0
@@ -2,28 +2,35 @@ from functools import lru_cache
 
 import regex
 
+from .prefilter import PrefilteredRegex
+
+
+def fuzzy_regex(regex_string, flags=0):
+    """Compile regex with a prefilter of cheap necessary conditions."""
+    return PrefilteredRegex(regex.compile(regex_string, flags))
+
 
 def bm_regex(regex_string):
     """Compile best multiline regex."""
-    return regex.compile(regex_string, regex.B | regex.M)
+    return fuzzy_regex(regex_string, regex.B | regex.M)
 
 
 # Mapping of "branch root" items that might appear more than once
 TAG_PATH_REGEXES = {
-    "article": regex.compile(r"^/(?:(?:sub-){e<=1})?(?:article){e<=2}$"),
-    "article_meta": regex.compile(
+    "article": fuzzy_regex(r"^/(?:(?:sub-){e<=1})?(?:article){e<=2}$"),
+    "article_meta": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=2}$"
         r"|^/(?:sub-){e<=1}(?:article){e<=2}"
         r"/(?:front-stub){e<=2}$"
     ),
-    "journal_meta": regex.compile(
+    "journal_meta": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:journal-meta){e<=2}$"
         r"|^/(?:sub-){e<=1}(?:article){e<=2}"
         r"/(?:front-stub){e<=2}$"
     ),
-    "contrib": regex.compile(
+    "contrib": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=4}"
         r"/(?:.*/)?(?:contrib){e<=2}$"
@@ -31,7 +38,7 @@ TAG_PATH_REGEXES = {
         r"/(?:front-stub){e<=2}"
         r"/(?:.*/)?(?:contrib){e<=2}$"
     ),
-    "aff": regex.compile(
+    "aff": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=4}"
         r"/(?:.*/)?(?:aff){e<=1}$"
@@ -39,7 +46,7 @@ TAG_PATH_REGEXES = {
         r"/(?:front-stub){e<=2}"
         r"/(?:.*/)?(?:aff){e<=1}$"
     ),
-    "pub_date": regex.compile(
+    "pub_date": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=2}"
         r"/(?:.*/)?(?:pub-date){e<=2}$"
@@ -47,7 +54,7 @@ TAG_PATH_REGEXES = {
         r"/(?:front-stub){e<=2}"
         r"/(?:.*/)?(?:pub-date){e<=2}$"
     ),
-    "history_date": regex.compile(
+    "history_date": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=2}"
         r"/(?:.*/)?(?:history){e<=2}"
@@ -57,7 +64,7 @@ TAG_PATH_REGEXES = {
         r"/(?:.*/)?(?:history){e<=2}"
         r"/(?:.*/)?(?:date){e<=1}$"
     ),
-    "kwd_group": regex.compile(
+    "kwd_group": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=2}"
         r"/(?:kwd){e<=1}(?:-group){e<=2}$"
@@ -65,7 +72,7 @@ TAG_PATH_REGEXES = {
         r"/(?:front-stub){e<=2}"
         r"/(?:kwd){e<=1}(?:-group){e<=2}$"
     ),
-    "trans_abstract": regex.compile(
+    "trans_abstract": fuzzy_regex(
         r"/(?:front){e<=1}"
         r"/(?:.*/)?(?:article-meta){e<=2}"
         r"/(?:trans-){e<=1}(?:abstract){e<=1}$"
@@ -73,7 +80,7 @@ TAG_PATH_REGEXES = {
         r"/(?:front-stub){e<=2}"
         r"/(?:trans-){e<=1}(?:abstract){e<=1}$"
     ),
-    "sub_article": regex.compile(r".+/(?:sub-){e<=1}(?:article){e<=2}$"),
+    "sub_article": fuzzy_regex(r".+/(?:sub-){e<=1}(?:article){e<=2}$"),
 }
 
 
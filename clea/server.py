@@ -22,9 +22,10 @@ def upload_file():
         except:
             flash("Error: can't load the given file")
             return redirect(request.url)
-        return jsonify(clean_empty({
-            **article.data_full,
-            "filename": xml_file.filename,
-            "aff_contrib_pairs": article.aff_contrib_full_indices,
-        }))
+        with article:
+            return jsonify(clean_empty({
+                **article.data_full,
+                "filename": xml_file.filename,
+                "aff_contrib_pairs": article.aff_contrib_full_indices,
+            }))
     return render_template("upload.html")
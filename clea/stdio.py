@@ -0,0 +1,81 @@
+from queue import Queue
+import struct
+from threading import Thread
+
+
+_LENGTH_PREFIX = struct.Struct(">I")  # 4-byte unsigned big-endian
+_STOP = object()  # Queue sentinel to finish the prefetch generator
+
+
+class FramingError(Exception):
+    pass
+
+
+def nul_delimited_gen(stream, chunk_size=2 ** 16):
+    """Generator of the NUL-delimited documents (as bytes)
+    read from the given binary stream,
+    where the last one might have no trailing NUL.
+    """
+    pieces = []  # Chunk parts of the pending document
+    for chunk in iter(lambda: stream.read1(chunk_size), b""):
+        start = 0
+        end = chunk.find(b"\0")
+        while end >= 0:
+            pieces.append(chunk[start:end])
+            yield b"".join(pieces)
+            pieces.clear()
+            start = end + 1
+            end = chunk.find(b"\0", start)
+        if start < len(chunk):
+            pieces.append(chunk[start:])
+    if pieces:
+        yield b"".join(pieces)
+
+
+def length_prefixed_gen(stream):
+    """Generator of the length-prefixed documents (as bytes)
+    read from the given binary stream,
+    where each document is preceded by its length
+    as a 4-byte unsigned big-endian integer.
+    """
+    while True:
+        prefix = stream.read(_LENGTH_PREFIX.size)
+        if not prefix:
+            return
+        if len(prefix) < _LENGTH_PREFIX.size:
+            raise FramingError("Truncated length prefix")
+        length, = _LENGTH_PREFIX.unpack(prefix)
+        document = stream.read(length)
+        if len(document) < length:
+            raise FramingError("Truncated document")
+        yield document
+
+
+FRAMING_GENS = {
+    "nul": nul_delimited_gen,
+    "length": length_prefixed_gen,
+}
+
+
+def prefetch_gen(iterable, size=64):
+    """Generator of the items from the given iterable,
+    which is consumed in a background thread
+    with at most ``size`` items waiting in a queue.
+    """
+    queue = Queue(size)
+    error = None
+
+    def fill():
+        nonlocal error
+        try:
+            for item in iterable:
+                queue.put(item)
+        except BaseException as exc:
+            error = exc
+        finally:
+            queue.put(_STOP)
+
+    Thread(target=fill, daemon=True).start()
+    yield from iter(queue.get, _STOP)
+    if error is not None:
+        raise error
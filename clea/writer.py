@@ -0,0 +1,147 @@
+import bz2
+import gzip
+import lzma
+import os
+from queue import Queue
+from threading import Thread
+
+
+COMPRESSION_OPENERS = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+_STOP = object()  # Queue sentinel to finish the writer thread
+
+
+def shard_path(path, index):
+    """Numbered shard file name for a rotated output file,
+    e.g. ``shard_path("out.jsonl.gz", 3) == "out-00003.jsonl.gz"``.
+    """
+    head, tail = os.path.split(path)
+    name, dot, extensions = tail.partition(".")
+    return os.path.join(head, f"{name}-{index:05d}{dot}{extensions}")
+
+
+class JSONLWriter:
+    """Background thread writer of JSON lines,
+    serializing and optionally compressing/rotating the output
+    while the producer keeps working,
+    with a bounded queue between them.
+
+    The ``path`` is either a file name or an already open binary stream
+    (which is not closed afterwards), and ``dumps`` is the function
+    that serializes each item to a JSON string.
+    When ``rotate_size`` is given, the output is split in numbered
+    shards with at most that many (uncompressed) bytes each,
+    though a single line is never split.
+    With ``track_offsets``, the ``offsets`` list gets
+    an ``(output, offset)`` pair for each line, where ``output``
+    is the file/shard name (``None`` for a stream output)
+    and ``offset`` is the (uncompressed) starting position
+    of the line in it.
+    With ``flush_idle``, the output is flushed whenever the queue
+    gets empty, for interactive consumers of the output stream.
+    """
+    def __init__(self, path, dumps, compress=None, rotate_size=0,
+                 queue_size=1024, track_offsets=False, flush_idle=False):
+        if rotate_size and not isinstance(path, str):
+            raise ValueError("Can't rotate a stream output")
+        self.path = path
+        self.dumps = dumps
+        self.opener = COMPRESSION_OPENERS[compress] if compress else None
+        self.rotate_size = rotate_size
+        self.offsets = [] if track_offsets else None
+        self.flush_idle = flush_idle
+        self.queue = Queue(queue_size)
+        self.error = None
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, item):
+        """Enqueue an item to be written as a JSON line."""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(item)
+
+    def close(self):
+        """Wait until every enqueued item is written,
+        re-raising in the caller thread any error from the writer thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _target(self, index):
+        if self.rotate_size:
+            return shard_path(self.path, index)
+        return self.path
+
+    def _open(self, index):
+        target = self._target(index)
+        if self.opener:
+            return self.opener(target, "wb")
+        if isinstance(target, str):
+            return open(target, "wb")
+        return target
+
+    def _flush(self, fobj):
+        fobj.flush()
+        if fobj is not self.path and not isinstance(self.path, str):
+            self.path.flush()
+
+    def _release(self, fobj):
+        if fobj is self.path:
+            fobj.flush()
+        else:
+            fobj.close()  # Doesn't close a stream wrapped by a compressor
+            if not isinstance(self.path, str):
+                self.path.flush()
+
+    def _run(self):
+        fobj = None
+        try:
+            index = size = 0
+            fobj = self._open(index)
+            for item in iter(self.queue.get, _STOP):
+                line = (self.dumps(item) + "\n").encode("utf-8")
+                if self.rotate_size and size and \
+                        size + len(line) > self.rotate_size:
+                    self._release(fobj)
+                    index += 1
+                    size = 0
+                    fobj = self._open(index)
+                fobj.write(line)
+                self._after_write(fobj, index, size)
+                size += len(line)
+        except BaseException as exc:
+            self.error = exc
+            while self.queue.get() is not _STOP:
+                pass  # Keep consuming to never block the producer
+        finally:
+            if fobj is not None:
+                self._finish(fobj)
+
+    def _after_write(self, fobj, index, offset):
+        if self.offsets is not None:
+            target = self._target(index)
+            output = target if isinstance(target, str) else None
+            self.offsets.append((output, offset))
+        if self.flush_idle and self.queue.empty():
+            self._flush(fobj)
+
+    def _finish(self, fobj):
+        try:
+            self._release(fobj)
+        except BaseException as exc:
+            if self.error is None:
+                self.error = exc
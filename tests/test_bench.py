@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from clea.bench import diff_gen, main
+
+
+TESTS_DIRECTORY = Path(__file__).parent
+
+
+def test_diff_gen():
+    base = {"a": [{"b": ["x"]}, {"c": ["y"]}], "d": ["z"], "e": ["w"]}
+    head = {"a": [{"b": ["x"]}, {"c": ["Y"]}], "d": ["z", "z"], "f": ["v"]}
+    assert list(diff_gen(base, head)) == [
+        (("a", 1, "c", 0), "y", "Y"),
+        (("d",), ["z"], ["z", "z"]),
+        (("e",), ["w"], None),
+        (("f",), None, ["v"]),
+    ]
+
+
+def test_bench_same_source_tree(tmp_path):
+    for xml_file_path in TESTS_DIRECTORY.glob("xml/*"):
+        for idx in range(5):
+            (tmp_path / f"{idx}_{xml_file_path.name}").write_bytes(
+                xml_file_path.read_bytes()
+            )
+    source_tree = str(TESTS_DIRECTORY.parent)
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(main, [
+        "--base", source_tree, "--head", source_tree, str(tmp_path),
+    ])
+
+    assert result.exit_code == 0, result.stdout
+    assert "15 documents, 0 differences" in result.stdout
+    assert result.stdout.count("(median of 10 rounds)") == 2
@@ -1,9 +1,16 @@
+from contextlib import closing
+from io import BytesIO
 from pathlib import Path
+import sqlite3
+import struct
 
 from click.testing import CliRunner
 import pytest
+import ujson
 
 from clea.__main__ import main
+from clea.stdio import nul_delimited_gen
+from clea.writer import COMPRESSION_OPENERS
 
 
 TESTS_DIRECTORY = Path(__file__).parent
@@ -23,3 +30,182 @@ def test_clea_cli_from_valid_files(xml_file_path, monkeypatch):
     assert result.exit_code == 0
     assert result.stdout_bytes == expected_result
     assert result.stderr_bytes == b""
+
+
+@pytest.mark.parametrize("compress", sorted(COMPRESSION_OPENERS))
+def test_clea_cli_compressed_rotated_output(compress, tmp_path, monkeypatch):
+    xml_file_names = ["xml/broken_article.xml", "xml/empty.xml"] * 2
+    expected_result = b"".join(
+        (TESTS_DIRECTORY / name.replace("xml", "json")).read_bytes()
+        for name in xml_file_names
+    )
+    output_path = tmp_path / "out.jsonl"
+
+    monkeypatch.chdir(TESTS_DIRECTORY)
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(main, xml_file_names + [
+        "-o", str(output_path), "--compress", compress, "--rotate-size", "512",
+    ])
+
+    assert result.exit_code == 0
+    assert result.stdout_bytes == result.stderr_bytes == b""
+    shards = sorted(tmp_path.iterdir())
+    assert [shard.name for shard in shards] == [
+        f"out-{idx:05d}.jsonl" for idx in range(len(shards))
+    ]
+    assert len(shards) > 1
+    opener = COMPRESSION_OPENERS[compress]
+    assert b"".join(opener(shard).read() for shard in shards) \
+        == expected_result
+
+
+def test_clea_cli_incremental(tmp_path, monkeypatch):
+    xml_dir = tmp_path / "xml"
+    xml_dir.mkdir()
+    for xml_file_path in TESTS_DIRECTORY.glob("xml/*"):
+        (xml_dir / xml_file_path.name).write_bytes(xml_file_path.read_bytes())
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner(mix_stderr=False)
+
+    def run(*args):
+        result = runner.invoke(main, ["--incremental", "manifest.db", *args])
+        assert result.exit_code == 0
+        return list(map(ujson.loads, result.stdout_bytes.splitlines()))
+
+    def manifest_rows():
+        with closing(sqlite3.connect("manifest.db")) as conn:
+            return list(conn.execute("SELECT path, output, offset FROM files "
+                                     "ORDER BY path"))
+
+    broken_path = str(xml_dir / "broken_article.xml")
+    empty_path = str(xml_dir / "empty.xml")
+    other_path = str(xml_dir / "Vkbh7CKQDNQzX7bW3cQVdJx.xml")
+    expected_first = [
+        {**ujson.loads((TESTS_DIRECTORY / f"json/{name}.json").read_bytes()),
+         "filename": str(xml_dir / f"{name}.xml")}
+        for name in ["broken_article", "empty"]
+    ]
+    assert run("xml/broken_article.xml", "xml/empty.xml") == expected_first
+    first_line_size = len(ujson.dumps(expected_first[0],
+        ensure_ascii=False,
+        escape_forward_slashes=False,
+    ).encode("utf-8")) + 1
+    assert manifest_rows() == [
+        (broken_path, "-", 0),
+        (empty_path, "-", first_line_size),
+    ]
+
+    # Same files with other spellings
+    assert run("./xml/empty.xml", broken_path) == []
+
+    # Another batch of the same collection
+    other_result = run("xml/Vkbh7CKQDNQzX7bW3cQVdJx.xml")
+    assert [row["filename"] for row in other_result] == [other_path]
+    assert [row[0] for row in manifest_rows()] \
+        == [other_path, broken_path, empty_path]
+
+    Path(empty_path).write_text("<article/>\n")
+    Path(broken_path).unlink()
+    assert run("xml/empty.xml", "-o", "delta.jsonl") == []
+    with open("delta.jsonl", "rb") as delta_file:
+        assert list(map(ujson.loads, delta_file)) == [
+            {"filename": empty_path},
+            {"filename": broken_path, "deleted": True},
+        ]
+    assert manifest_rows() == [
+        (other_path, "-", 0),
+        (empty_path, str(tmp_path / "delta.jsonl"), 0),
+    ]
+
+
+MISLABELED_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<article><front><article-meta>
+<article-title>São&nbsp;Paulo &eacute; &amp;</article-title>
+</article-meta></front></article>
+"""
+
+
+def test_clea_cli_incremental_decodes_like_plain_mode(tmp_path,
+                                                      monkeypatch):
+    (tmp_path / "mislabeled.xml").write_bytes(MISLABELED_XML.encode("utf-8"))
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner(mix_stderr=False)
+
+    def run(*args):
+        result = runner.invoke(main, [*args, "mislabeled.xml"])
+        assert result.exit_code == 0
+        return ujson.loads(result.stdout_bytes)
+
+    plain_result = run()
+    incremental_result = run("--incremental", "manifest.db")
+    assert plain_result["article_meta"][0]["article_title"] \
+        == ["São Paulo é &"]
+    assert incremental_result == {
+        **plain_result,
+        "filename": str(tmp_path / "mislabeled.xml"),
+    }
+
+
+@pytest.mark.parametrize("framing", ["nul", "length"])
+def test_clea_cli_stdio(framing):
+    xml_file_names = ["broken_article", "empty", "broken_article"]
+    documents = [(TESTS_DIRECTORY / f"xml/{name}.xml").read_bytes()
+                 for name in xml_file_names]
+    if framing == "nul":
+        input_bytes = b"\0".join(documents)
+    else:
+        input_bytes = b"".join(struct.pack(">I", len(document)) + document
+                               for document in documents)
+    expected_result = [
+        {k: v for k, v in ujson.loads(
+            (TESTS_DIRECTORY / f"json/{name}.json").read_bytes()
+         ).items() if k != "filename"}
+        for name in xml_file_names
+    ]
+
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(main, ["--stdio", framing], input=input_bytes)
+
+    assert result.exit_code == 0
+    assert list(map(ujson.loads, result.stdout_bytes.splitlines())) \
+        == expected_result
+    assert result.stderr_bytes == b""
+
+
+def test_clea_cli_stdio_decodes_like_plain_mode(tmp_path):
+    xml_path = tmp_path / "mislabeled.xml"
+    xml_path.write_bytes(MISLABELED_XML.encode("utf-8"))
+    runner = CliRunner(mix_stderr=False)
+    plain_result = runner.invoke(main, [str(xml_path)])
+    stdio_result = runner.invoke(main, ["--stdio", "nul"],
+                                 input=xml_path.read_bytes())
+
+    assert plain_result.exit_code == stdio_result.exit_code == 0
+    assert ujson.loads(stdio_result.stdout_bytes) == {
+        k: v for k, v in ujson.loads(plain_result.stdout_bytes).items()
+        if k != "filename"
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+def test_nul_delimited_gen_chunk_boundaries(chunk_size):
+    data = b"<a/>\0\0<bb>x</bb>\0<c/>"
+    stream = BytesIO(data)
+    assert list(nul_delimited_gen(stream, chunk_size=chunk_size)) \
+        == [b"<a/>", b"", b"<bb>x</bb>", b"<c/>"]
+    stream = BytesIO(data + b"\0")
+    assert list(nul_delimited_gen(stream, chunk_size=chunk_size)) \
+        == [b"<a/>", b"", b"<bb>x</bb>", b"<c/>"]
+
+
+@pytest.mark.parametrize("size", ["-5", "0", "0K", "1x"])
+def test_clea_cli_invalid_rotate_size(size, tmp_path):
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(main, [
+        str(TESTS_DIRECTORY / "xml/empty.xml"),
+        "-o", str(tmp_path / "out.jsonl"), "--rotate-size", size,
+    ])
+
+    assert result.exit_code == 2
+    assert "--rotate-size" in result.stderr
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,158 @@
+from contextlib import contextmanager
+import gc
+from io import StringIO
+import os
+from pathlib import Path
+import weakref
+
+from lxml import etree
+import pytest
+
+from clea import Article
+
+
+TESTS_DIRECTORY = Path(__file__).parent
+
+
+@contextmanager
+def gc_disabled():
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+@pytest.mark.parametrize("xml_file_path", TESTS_DIRECTORY.glob("xml/*"))
+def test_closed_article_is_freed_without_cyclic_gc(xml_file_path):
+    with gc_disabled():
+        with Article(str(xml_file_path), raise_on_invalid=False) as art:
+            art.data_full
+            art.aff_contrib_full_indices
+            art_ref = weakref.ref(art)
+        assert art.root is None
+        with pytest.raises(ValueError, match="Article is closed"):
+            art.data_full
+        del art
+        assert art_ref() is None
+
+
+@pytest.mark.parametrize("xml_file_path", TESTS_DIRECTORY.glob("xml/*"))
+def test_closed_branch_raises(xml_file_path):
+    art = Article(str(xml_file_path), raise_on_invalid=False)
+    branch = art.article[0]
+    branch.data_full
+    branch.close()
+    for name in ["data_full", "paths", "paths_str", "nodes", "ends"]:
+        with pytest.raises(ValueError, match="Branch is closed"):
+            getattr(branch, name)
+    with pytest.raises(ValueError, match="Branch is closed"):
+        branch.get("lang")
+
+
+@pytest.mark.parametrize("xml_file_path", TESTS_DIRECTORY.glob("xml/*"))
+def test_unclosed_article_is_freed_without_cyclic_gc(xml_file_path):
+    with gc_disabled():
+        art = Article(str(xml_file_path), raise_on_invalid=False)
+        art.data_full
+        art.aff_contrib_full_indices
+        art.sub_article
+        art_ref = weakref.ref(art)
+        del art
+        assert art_ref() is None
+
+
+def get_rss():
+    """Resident set size of this process, in bytes."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"),
+                    reason="Requires /proc/self/statm")
+def test_long_run_memory_is_flat():
+    xml_file_path = str(TESTS_DIRECTORY / "xml/Vkbh7CKQDNQzX7bW3cQVdJx.xml")
+
+    def extract(num_articles):
+        for unused in range(num_articles):
+            art = Article(xml_file_path)
+            art.data_full
+            art.aff_contrib_full_indices
+
+    with gc_disabled():
+        extract(100)  # Warm up
+        rss_start = get_rss()
+        extract(1500)
+        assert get_rss() - rss_start < 5 * 2 ** 20
+
+
+@pytest.mark.parametrize("xml_file_path", TESTS_DIRECTORY.glob("xml/*"))
+def test_article_from_bytes_and_tree(xml_file_path):
+    art = Article(str(xml_file_path), raise_on_invalid=False)
+    raw_data = xml_file_path.read_bytes()
+    art_bytes = Article.from_bytes(raw_data, raise_on_invalid=False)
+    art_tree = Article.from_tree(art.root)
+    assert art_bytes.data_full == art.data_full
+    assert art_tree.data_full == art.data_full
+    assert art_tree.root is art.root  # No entity, no copy
+
+
+def test_article_from_tree_replaces_entities_in_a_copy():
+    root = etree.fromstring(
+        "<article><front><article-meta>"
+        "<article-title>S</article-title>"
+        "</article-meta></front></article>"
+    )
+    title = root.find(".//article-title")
+    title.append(etree.Entity("atilde"))
+    title[0].tail = "o Paulo"
+    art = Article.from_tree(root)
+    assert art.article_meta[0].article_title == ["São Paulo"]
+    assert title[0].tag is etree.Entity
+
+
+ENTITIES_XML = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE article PUBLIC "-//NLM//DTD JATS 1.1//EN" "JATS.dtd">
+<article><front><article-meta>
+<article-title>S&atilde;o&nbsp;Paulo &amp; &lt;Rio&gt;&#233;&AMP;&LT;\
+</article-title>
+<abstract><p>&eacute;&eacute;<italic>caf&eacute;</italic>&nbsp;x&unknown;y</p>
+<p><![CDATA[&nbsp;]]><!-- &eacute; -->&ccedil;</p></abstract>
+</article-meta></front></article>
+"""
+
+
+def test_html_entities_replacement_before_parsing():
+    expected = {
+        "article_title": ["São Paulo & <Rio>é&<"],
+        "abstract_p": ["éécafé x&unknown;y", "&nbsp;ç"],
+    }
+
+    def get_expected_keys(article):
+        data = article.article_meta[0].data_full
+        return {k: data[k] for k in expected}
+
+    art = Article(StringIO(ENTITIES_XML))
+    assert get_expected_keys(art) == expected
+    art_bytes = Article.from_bytes(ENTITIES_XML.encode("utf-8"))
+    assert get_expected_keys(art_bytes) == expected
+
+    parser = etree.XMLParser(recover=True, resolve_entities=False)
+    root = etree.fromstring(ENTITIES_XML.encode("utf-8"), parser=parser)
+    if next(root.iterdescendants(tag=etree.Entity), None) is None:
+        pytest.skip("This libxml2 version doesn't keep the entities")
+    art_tree = Article.from_tree(root)  # Replaces each Entity node
+    assert get_expected_keys(art_tree) == expected
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "iso-8859-1", "cp1252"])
+def test_article_from_bytes_declared_encoding(encoding):
+    xml_bytes = (
+        f'<?xml version="1.0" encoding="{encoding}"?>\n'
+        "<article><front><article-meta>"
+        "<article-title>São&nbsp;Paulo &eacute; &amp;</article-title>"
+        "</article-meta></front></article>"
+    ).encode(encoding)
+    art = Article.from_bytes(xml_bytes)
+    assert art.article_meta[0].article_title == ["São Paulo é &"]
@@ -0,0 +1,80 @@
+from io import StringIO
+from pathlib import Path
+import random
+
+import pytest
+
+from clea import Article
+from clea.core import etree_path_gen
+from clea.prefilter import reset_prefilter_stats
+from clea.regexes import BRANCH_REGEXES, TAG_PATH_REGEXES
+
+
+TESTS_DIRECTORY = Path(__file__).parent
+
+ALL_REGEXES = [*TAG_PATH_REGEXES.values(),
+               *(rgx for triples in BRANCH_REGEXES.values()
+                     for unused_name, unused_attr, rgx in triples)]
+
+
+def mutate(rnd, string, alphabet="/@=-%abcdefghijklmnoprstuvy"):
+    chars = list(string)
+    for unused in range(rnd.randint(1, 4)):
+        idx = rnd.randint(0, len(chars))
+        operation = rnd.choice(["insert", "delete", "replace"])
+        if operation == "insert" or idx == len(chars):
+            chars.insert(idx, rnd.choice(alphabet))
+        elif operation == "delete":
+            del chars[idx]
+        else:
+            chars[idx] = rnd.choice(alphabet)
+    return "".join(chars)
+
+
+def sample_strings():
+    strings = set()
+    for xml_file_path in TESTS_DIRECTORY.glob("xml/*"):
+        art = Article(str(xml_file_path), raise_on_invalid=False)
+        strings.update(path for path, el in art.tag_paths_pairs)
+        strings.update(path for path, el in etree_path_gen(art.root))
+    rnd = random.Random(42)
+    strings.update([mutate(rnd, string)
+                    for string in sorted(strings) for unused in range(3)])
+    return sorted(strings)
+
+
+@pytest.mark.parametrize("rgx", ALL_REGEXES, ids=lambda rgx: rgx.pattern)
+def test_prefilter_never_rejects_a_match(rgx):
+    for string in sample_strings():
+        if not rgx.accepts(string):
+            assert rgx.regex.search(string) is None, string
+
+
+def test_prefilter_rejects_obvious_mismatches():
+    article_regex = TAG_PATH_REGEXES["article"]
+    assert not article_regex.accepts("/article/front/article-meta")
+    assert not TAG_PATH_REGEXES["contrib"].accepts("/article")
+
+
+def test_branch_prefilter_checks_the_whole_paths_str():
+    art = Article(StringIO(
+        "<article><front><article-meta><contrib-group>"
+        "<contrib><name><surname>Plain</surname></name></contrib>"
+        '<contrib contrib-type="author"><xref ref-type="aff"/></contrib>'
+        "</contrib-group></article-meta></front></article>"
+    ))
+    plain_contrib, attr_contrib = art.contrib
+    orcid_regex = plain_contrib.field_regexes["contrib_orcid"]
+    reset_prefilter_stats()
+
+    assert plain_contrib.paths_str == \
+        "/contrib\n/contrib/name\n/contrib/name/surname"
+    assert plain_contrib.get("contrib_orcid") == []
+    assert (orcid_regex.checked, orcid_regex.rejected) == (1, 1)
+
+    # A single path with "@" and "=" is enough to accept all of them
+    assert attr_contrib.paths_str == \
+        "/contrib@contrib-type=author\n" \
+        "/contrib@contrib-type=author/xref@ref-type=aff"
+    assert attr_contrib.get("contrib_orcid") == []
+    assert (orcid_regex.checked, orcid_regex.rejected) == (2, 1)